@@ -6,29 +6,121 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib, Gio, Gdk, Pango
 import subprocess
 import os
+import hashlib
 import json
+import queue
 import threading
 import time
 from pathlib import Path
 import signal
 import sys
 import shlex
+from functools import partial
+from types import MappingProxyType
+from collections import deque
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEBUG = bool(os.environ.get('WAYREC_DEBUG'))
+
+SETTINGS_DIR = Path.home() / '.config' / 'wf-recorder-gui'
+SETTINGS_FILE = SETTINGS_DIR / 'settings.json'
+DEFAULT_OUTPUT_DIR = Path.home() / 'Videos'
+CSS_PATH = Path(__file__).parent / 'styles.css'
+
+# Read-only so callers can't mutate the defaults; get_default_settings() hands out copies
+DEFAULT_SETTINGS = MappingProxyType({
+    'output_directory': str(DEFAULT_OUTPUT_DIR),
+    'framerate': '30',
+    'audio_enabled': True,
+    'audio_device': '',
+    'codec': 'libx264',
+    'pixel_format': 'yuv420p',
+    'audio_codec': 'aac',
+    'sample_rate': '48000',
+    'custom_params': '',
+    'live_css_reload': False,
+    'geometry': None,
+    'video_bitrate': '',
+    'audio_bitrate': '',
+    'container_format': 'mp4',
+    'hardware_acceleration': False,
+    'gpu_device': '',
+    'preset': 'medium',
+    'crf': '23',
+    'buffer_size': '',
+    'threads': '',
+    'stop_shortcut': '<Control><Shift>R'
+})
+
+# Zero-padded clock components, so ticks don't format strings
+TWO_DIGITS = tuple(f"{i:02d}" for i in range(100))
+
+OUTPUT_FILENAME_TEMPLATE = 'Recording_{ts}.{ext}'
+TIMESTAMP_FORMAT = '%Y-%m-%d_%H-%M-%S'
+
+# (setting key, wf-recorder flag, optional predicate(value, codec) deciding if the flag applies)
+RECORDER_FLAGS = (
+    ('codec', '-c', None),
+    ('pixel_format', '-x', lambda value, codec: 'vaapi' not in codec),
+    ('framerate', '-r', lambda value, codec: value.isdigit()),
+    ('video_bitrate', '-b', None),
+)
+
+# Codec name prefixes mapped to the settings passed to them as `-p name=value`
+CODEC_PARAMS = {
+    ('libx264', 'libx265'): ('preset', 'crf'),
+}
+
+def dumps_settings(settings):
+    """Serializes settings to JSON bytes, using orjson when it is installed."""
+    if orjson:
+        return orjson.dumps(settings, option=orjson.OPT_INDENT_2)
+    return json.dumps(settings, indent=4).encode()
+
+def loads_settings(data):
+    return orjson.loads(data) if orjson else json.loads(data)
 
 class WFRecorderApp(Adw.Application):
     """Main application class for the WF-Recorder GUI."""
+    # Themed icons by name and notifications by (title, icon, buttons); only the body changes between sends
+    _icon_cache = {}
+    _notification_cache = {}
+
     def __init__(self):
         super().__init__(application_id='com.wfrecorder.gui', flags=Gio.ApplicationFlags.HANDLES_COMMAND_LINE)
         self.recording_process = None
         self.is_recording = False
         self.is_paused = False
+        SETTINGS_DIR.mkdir(parents=True, exist_ok=True)
         self.settings = self.load_settings()
-        self.start_time = None
+        self._settings_digest = hashlib.blake2b(dumps_settings(self.settings), digest_size=16).digest()
+        self._save_pending = None
+        # Keys changed since the last save; an empty set means there is nothing to write
+        self._dirty = set()
+        self._cmd_template = None
+        self._settings_queue = queue.Queue()
+        self._settings_thread = None
+        self.start_time_us = None
         self.win = None
         self.last_output_path = None
-        self.timer_id = None
+        self.tick_id = None
 
     def do_startup(self):
         Adw.Application.do_startup(self)
+        self._settings_thread = threading.Thread(target=self._settings_writer, daemon=True)
+        self._settings_thread.start()
+        # Drop temporary files left behind by an interrupted save. This runs only in the primary
+        # instance, so a second launch can't delete a save that is still in flight
+        for leftover in SETTINGS_DIR.glob('*.tmp'):
+            try:
+                leftover.unlink(missing_ok=True)
+            except OSError as e:
+                print(f"Could not remove leftover settings file {leftover}: {e}", file=sys.stderr)
+
         style_manager = Adw.StyleManager.get_default()
         style_manager.set_color_scheme(Adw.ColorScheme.DEFAULT)
 
@@ -49,6 +141,8 @@ class WFRecorderApp(Adw.Application):
         open_file_action.connect("activate", self.on_open_file_action)
         self.add_action(open_file_action)
 
+        signal.signal(signal.SIGINT, self._quit_app)
+
     def do_command_line(self, command_line):
         """Handles command line arguments. Fixes GLib-GIO-WARNING."""
         self.activate()
@@ -77,67 +171,173 @@ class WFRecorderApp(Adw.Application):
         if not self.win:
             self.win = MainWindow(application=self)
         self.win.present()
-        signal.signal(signal.SIGINT, self._quit_app)
 
     def _quit_app(self, signum, frame):
-        if self.is_recording:
+        # The process also exists during the startup check, before is_recording is set
+        if self.recording_process and self.win:
             self.win.stop_recording()
+        self.flush_settings()
         self.quit()
 
+    def do_shutdown(self):
+        self.flush_settings()
+        # Without a running writer nothing would ever drain the queue
+        if self._settings_thread and self._settings_thread.is_alive():
+            self._settings_queue.join()
+        Adw.Application.do_shutdown(self)
+
     def get_default_settings(self):
-        return {
-            'output_directory': str(Path.home() / 'Videos'),
-            'framerate': '30',
-            'audio_enabled': True,
-            'audio_device': '',
-            'codec': 'libx264',
-            'pixel_format': 'yuv420p',
-            'audio_codec': 'aac',
-            'sample_rate': '48000',
-            'custom_params': '',
-            'live_css_reload': False,
-            'geometry': None,
-            'video_bitrate': '',
-            'audio_bitrate': '',
-            'container_format': 'mp4',
-            'hardware_acceleration': False,
-            'gpu_device': '',
-            'preset': 'medium',
-            'crf': '23',
-            'buffer_size': '',
-            'threads': '',
-            'stop_shortcut': '<Control><Shift>R'
-        }
+        return dict(DEFAULT_SETTINGS)
 
     def load_settings(self):
-        settings_file = Path.home() / '.config' / 'wf-recorder-gui' / 'settings.json'
         default_settings = self.get_default_settings()
 
-        if settings_file.exists():
-            try:
-                with open(settings_file, 'r') as f:
-                    loaded_settings = json.load(f)
-                    default_settings.update(loaded_settings)
-            except (json.JSONDecodeError, Exception) as e:
-                print(f"Error loading settings, using defaults: {e}", file=sys.stderr)
+        try:
+            with open(SETTINGS_FILE, 'rb') as f:
+                loaded_settings = loads_settings(f.read())
+            if not isinstance(loaded_settings, dict):
+                raise ValueError(f"expected a JSON object, got {type(loaded_settings).__name__}")
+            default_settings.update(loaded_settings)
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, Exception) as e:
+            print(f"Error loading settings, using defaults: {e}", file=sys.stderr)
         return default_settings
 
-    def save_settings(self):
-        settings_file = Path.home() / '.config' / 'wf-recorder-gui' / 'settings.json'
-        settings_file.parent.mkdir(parents=True, exist_ok=True)
+    def _save_settings_now(self):
+        """Hands the serialized settings to the writer thread; never blocks on disk."""
+        if not self._dirty:
+            return
+        self._dirty.clear()
+        # Comparing digests of the serialized form makes a save with nothing changed free
+        data = dumps_settings(self.settings)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == self._settings_digest:
+            return
+        self._settings_digest = digest
+
+        # Only the latest state matters, so drop snapshots the writer hasn't picked up yet
         try:
-            with open(settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=4)
+            while True:
+                self._settings_queue.get_nowait()
+                self._settings_queue.task_done()
+        except queue.Empty:
+            pass
+        self._settings_queue.put((data, dict(self.settings)))
+
+    def _settings_writer(self):
+        while True:
+            data, snapshot = self._settings_queue.get()
+            try:
+                self._write_settings(data, snapshot)
+            finally:
+                self._settings_queue.task_done()
+
+    def _write_settings(self, data, snapshot):
+        # Write to a temporary file and swap it in so an interrupted save can't corrupt settings.json
+        tmp_file = SETTINGS_FILE.with_name(SETTINGS_FILE.name + '.tmp')
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, SETTINGS_FILE)
         except Exception as e:
             print(f"Error saving settings: {e}", file=sys.stderr)
+            # Save state belongs to the main loop, so the retry is scheduled from there
+            GLib.idle_add(self._on_settings_write_failed, snapshot)
+
+    def _on_settings_write_failed(self, snapshot):
+        # Don't treat the failed state as persisted; back off a little before retrying
+        self._settings_digest = None
+        self._dirty.update(snapshot)
+        self.save_settings(delay_ms=5000)
+        return GLib.SOURCE_REMOVE
+
+    def set_setting(self, key, value):
+        """Updates one setting and schedules a save; returns False if the value was unchanged."""
+        if self.settings.get(key) == value:
+            return False
+        self.settings[key] = value
+        self._dirty.add(key)
+        self.save_settings()
+        return True
+
+    def reset_settings(self):
+        self.settings = self.get_default_settings()
+        self._dirty.update(self.settings)
+        self.save_settings()
+
+    def save_settings(self, delay_ms=500):
+        """Coalesces bursts of setting changes (e.g. typing) into a single save."""
+        # Every settings change comes through here, so this is where the argv cache goes stale
+        self._cmd_template = None
+        if self._save_pending:
+            GLib.source_remove(self._save_pending)
+        self._save_pending = GLib.timeout_add(delay_ms, self._flush_settings)
+
+    def _flush_settings(self):
+        self._save_pending = None
+        self._save_settings_now()
+        return GLib.SOURCE_REMOVE
+
+    def flush_settings(self):
+        """Cancels any pending debounced save and saves right away."""
+        if self._save_pending:
+            GLib.source_remove(self._save_pending)
+            self._save_pending = None
+        self._save_settings_now()
+
+    def get_recorder_args(self):
+        """Returns the settings-derived wf-recorder argv, rebuilt only after settings change."""
+        if self._cmd_template is None:
+            self._cmd_template = self._build_recorder_args()
+        return self._cmd_template
+
+    def _build_recorder_args(self):
+        cmd = ['wf-recorder']
+        # Strip every string value once up front instead of at each lookup
+        s = {k: (v.strip() if isinstance(v, str) else v) for k, v in self.settings.items()}
+        if s['audio_enabled']:
+            cmd.append('--audio')
+            if audio_device := s.get('audio_device'):
+                cmd.extend(['--audio-device', audio_device])
+
+        codec = s.get('codec') or ''
+        for key, flag, applies in RECORDER_FLAGS:
+            value = s.get(key)
+            if value and (applies is None or applies(value, codec)):
+                cmd.extend([flag, value])
+
+        if s.get('hardware_acceleration'):
+            if gpu_dev := s.get('gpu_device'):
+                cmd.extend(['-d', gpu_dev])
+
+        for prefixes, params in CODEC_PARAMS.items():
+            if codec.startswith(prefixes):
+                for param in params:
+                    if value := s.get(param):
+                        cmd.extend(['-p', f"{param}={value}"])
+
+        if custom_params := s.get('custom_params'):
+            cmd.extend(shlex.split(custom_params))
+
+        return cmd
 
     def send_notification(self, notif_id, title, body, icon='media-record-symbolic', actions=None):
-        notification = Gio.Notification.new(title)
-        notification.set_body(body)
-        notification.set_icon(Gio.ThemedIcon.new(icon))
-        if actions:
-            for label, action_name in actions.items():
+        buttons = tuple(actions.items()) if actions else ()
+        key = (title, icon, buttons)
+        notification = self._notification_cache.get(key)
+        if notification is None:
+            icon_obj = self._icon_cache.get(icon)
+            if icon_obj is None:
+                icon_obj = self._icon_cache[icon] = Gio.ThemedIcon.new(icon)
+            notification = Gio.Notification.new(title)
+            notification.set_icon(icon_obj)
+            for label, action_name in buttons:
                 notification.add_button(label, action_name)
+            self._notification_cache[key] = notification
+        notification.set_body(body)
         super().send_notification(notif_id, notification)
 
 
@@ -146,6 +346,34 @@ class MainWindow(Adw.ApplicationWindow):
         super().__init__(**kwargs)
         self.app = self.get_application()
         self.css_watcher = None
+        self.css_reload_source = None
+        self.stop_shortcut = None
+        self._stop_shortcut_str = None
+        self.stderr_tail = deque(maxlen=200)
+        self.child_watch_id = None
+        self.stderr_watch_id = None
+        self.startup_check_id = None
+
+        # A single provider whose contents are replaced on every (re)load
+        self.css_provider = Gtk.CssProvider()
+        self._css_mtime_ns = None
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(), self.css_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER)
+
+        # Built-in styles never change, so they are parsed and added once rather than on every reload
+        self.css_provider_prog = Gtk.CssProvider()
+        programmatic_css = """
+        .shortcut-display {
+            background-color: alpha(@theme_fg_color, 0.08);
+            border: 1px solid @borders;
+            border-radius: 6px;
+            padding: 6px 12px;
+            font-size: 0.9em;
+        }
+        """
+        self.css_provider_prog.load_from_data(programmatic_css.encode())
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(), self.css_provider_prog, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
 
         self.set_title("WF-Recorder GUI")
         self.set_default_size(360, -1)
@@ -153,36 +381,33 @@ class MainWindow(Adw.ApplicationWindow):
         self.set_resizable(False)
         self.add_css_class("floating-window")
 
+        self.connect("close-request", self.on_close_request)
+
         self.load_css()
         self.setup_ui()
         self.setup_shortcuts()
         self.update_css_watcher()
 
     def load_css(self):
-        css_provider_file = Gtk.CssProvider()
-        css_path = Path(__file__).parent / "styles.css"
-        if css_path.exists():
-            try:
-                css_provider_file.load_from_path(str(css_path))
-                Gtk.StyleContext.add_provider_for_display(
-                    Gdk.Display.get_default(), css_provider_file, Gtk.STYLE_PROVIDER_PRIORITY_USER)
-            except Exception as e:
-                print(f"Error loading CSS from file: {e}", file=sys.stderr)
-
-        css_provider_prog = Gtk.CssProvider()
-        programmatic_css = """
-        .shortcut-display {
-            background-color: alpha(@theme_fg_color, 0.08);
-            border: 1px solid @borders;
-            border-radius: 6px;
-            padding: 6px 12px;
-            font-size: 0.9em;
-        }
-        """
-        css_provider_prog.load_from_data(programmatic_css.encode())
-        Gtk.StyleContext.add_provider_for_display(
-            Gdk.Display.get_default(), css_provider_prog, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
-
+        # Monitors report several events per save; only reparse when the file really changed
+        try:
+            mtime_ns = CSS_PATH.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None and mtime_ns != self._css_mtime_ns:
+            self._css_mtime_ns = mtime_ns
+            # Read the stylesheet asynchronously so startup and live reloads never block on I/O
+            Gio.File.new_for_path(str(CSS_PATH)).load_contents_async(None, self._on_css_loaded)
+
+    def _on_css_loaded(self, css_file, result):
+        try:
+            _, contents, _ = css_file.load_contents_finish(result)
+        except GLib.Error as e:
+            self._css_mtime_ns = None
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND):
+                print(f"Error loading CSS from file: {e.message}", file=sys.stderr)
+            return
+        self.css_provider.load_from_bytes(GLib.Bytes.new(contents))
 
     def setup_ui(self):
         root_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
@@ -192,17 +417,20 @@ class MainWindow(Adw.ApplicationWindow):
         root_box.append(self.header_bar)
 
         self.recording_stack = Gtk.Stack()
-        self.recording_stack.set_transition_type(Gtk.StackTransitionType.SLIDE_UP_DOWN)
+        # Crossfades need a single offscreen + blend per frame, unlike slides
+        self.recording_stack.set_transition_type(Gtk.StackTransitionType.CROSSFADE)
+        self.recording_stack.set_transition_duration(200)
         root_box.append(self.recording_stack)
 
         self.main_stack = Gtk.Stack()
-        self.main_stack.set_transition_type(Gtk.StackTransitionType.SLIDE_LEFT_RIGHT)
+        self.main_stack.set_transition_type(Gtk.StackTransitionType.CROSSFADE)
+        self.main_stack.set_transition_duration(200)
 
         main_content = self.create_main_content()
         self.main_stack.add_named(main_content, "main")
 
-        self.settings_view = AdvancedSettingsView(self)
-        self.main_stack.add_named(self.settings_view, "settings")
+        # Built on first use in show_settings; most sessions never open it
+        self.settings_view = None
         self.recording_stack.add_named(self.main_stack, "idle_view")
 
         recording_view = self.create_recording_view()
@@ -223,17 +451,22 @@ class MainWindow(Adw.ApplicationWindow):
         self.recording_stack.set_visible_child_name("idle_view")
 
     def setup_shortcuts(self):
-        for controller in list(self.observe_controllers()):
-            if isinstance(controller, Gtk.ShortcutController):
-                self.remove_controller(controller)
-
-        controller = Gtk.ShortcutController()
-        shortcut_str = self.app.settings.get('stop_shortcut', '<Control><Shift>R')
-        trigger = Gtk.ShortcutTrigger.parse_string(shortcut_str)
-        action = Gtk.NamedAction.new("app.stop")
-        shortcut = Gtk.Shortcut.new(trigger, action)
-        controller.add_shortcut(shortcut)
-        self.add_controller(controller)
+        # One persistent controller and shortcut; only the trigger is replaced when the setting changes
+        if self.stop_shortcut is None:
+            self.stop_shortcut = Gtk.Shortcut.new(None, Gtk.NamedAction.new("app.stop"))
+            controller = Gtk.ShortcutController()
+            controller.add_shortcut(self.stop_shortcut)
+            self.add_controller(controller)
+
+        self.update_shortcut('stop_shortcut', self.app.settings.get('stop_shortcut', '<Control><Shift>R'))
+
+    def update_shortcut(self, setting_key, accelerator):
+        """Swaps in a new trigger for the shortcut stored under setting_key."""
+        if setting_key != 'stop_shortcut' or accelerator == self._stop_shortcut_str:
+            return
+        self._stop_shortcut_str = accelerator
+        self.stop_shortcut.set_trigger(Gtk.ShortcutTrigger.parse_string(accelerator))
+        self.shortcut_label_recording.set_accelerator(accelerator)
 
     def on_stack_child_changed(self, stack, param):
         is_settings = stack.get_visible_child_name() == "settings"
@@ -252,20 +485,30 @@ class MainWindow(Adw.ApplicationWindow):
         return content_box
 
     def create_recording_view(self):
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=15, margin_top=15, margin_bottom=15, margin_start=15, margin_end=15)
+        # Status on top, clock centered, stop button at the bottom, without spacer widgets
+        box = Gtk.CenterBox(orientation=Gtk.Orientation.VERTICAL, margin_top=15, margin_bottom=15, margin_start=15, margin_end=15)
         box.add_css_class("recording-view")
 
         self.recording_status_label = Gtk.Label(label="Recording...")
         self.recording_status_label.add_css_class("recording-status-label")
-        box.append(self.recording_status_label)
-
-        box.append(Gtk.Box(vexpand=True))
-
-        self.time_label = Gtk.Label(label="00:00:00")
-        self.time_label.add_css_class("time-label")
-        box.append(self.time_label)
-
-        box.append(Gtk.Box(vexpand=True))
+        box.set_start_widget(self.recording_status_label)
+
+        # Separate HH/MM/SS labels so a tick only relayouts the parts that changed
+        self.time_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, halign=Gtk.Align.CENTER)
+        self.time_labels = []
+        for index in range(3):
+            if index:
+                separator = Gtk.Label(label=":")
+                separator.add_css_class("time-label")
+                self.time_box.append(separator)
+            label = Gtk.Label(label="00")
+            label.add_css_class("time-label")
+            self.time_box.append(label)
+            self.time_labels.append(label)
+        self._time_parts = [0, 0, 0]
+        self.time_box.connect("map", self.on_time_label_mapped)
+        self.time_box.connect("unmap", lambda box: self.stop_time_ticks())
+        box.set_center_widget(self.time_box)
 
         # Create a single button for stopping
         stop_button = Gtk.Button()
@@ -273,40 +516,31 @@ class MainWindow(Adw.ApplicationWindow):
         stop_button.add_css_class("stop-button-large")
         stop_button.set_halign(Gtk.Align.CENTER)
 
-        # Create a box to hold the content inside the button
-        button_content_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
-        button_content_box.set_halign(Gtk.Align.CENTER)
+        # "Stop" on the left and the shortcut on the right edge of the button
+        button_content_box = Gtk.CenterBox(orientation=Gtk.Orientation.HORIZONTAL)
         button_content_box.set_valign(Gtk.Align.CENTER)
-        button_content_box.set_halign(Gtk.Align.FILL) 
-        button_content_box.set_valign(Gtk.Align.CENTER)
-        
 
         # Add the "Stop" text
         stop_label = Gtk.Label(label="Stop")
         stop_label.set_margin_start(30)
-        button_content_box.append(stop_label)
-
-        spacer = Gtk.Box()
-        spacer.set_hexpand(True) # This makes the spacer fill all available horizontal space
-        button_content_box.append(spacer)
+        button_content_box.set_start_widget(stop_label)
 
         # Add the shortcut label inside the button
-        self.shortcut_label_recording = Gtk.ShortcutLabel(
-            accelerator=self.app.settings.get('stop_shortcut', '')
-        )
+        # The accelerator is filled in (and kept current) by setup_shortcuts
+        self.shortcut_label_recording = Gtk.ShortcutLabel()
         self.shortcut_label_recording.add_css_class("shortcut-display")
-        button_content_box.append(self.shortcut_label_recording)
+        button_content_box.set_end_widget(self.shortcut_label_recording)
 
         # Set the box as the child of the button
         stop_button.set_child(button_content_box)
 
-        box.append(stop_button)
+        box.set_end_widget(stop_button)
         return box
 
     def update_css_watcher(self):
         if self.app.settings.get('live_css_reload', False):
             if not self.css_watcher:
-                css_file = Gio.File.new_for_path(str(Path(__file__).parent / "styles.css"))
+                css_file = Gio.File.new_for_path(str(CSS_PATH))
                 self.css_watcher = css_file.monitor_file(Gio.FileMonitorFlags.NONE, None)
                 self.css_watcher.connect("changed", self.on_css_file_changed)
         elif self.css_watcher:
@@ -314,9 +548,20 @@ class MainWindow(Adw.ApplicationWindow):
             self.css_watcher = None
 
     def on_css_file_changed(self, monitor, file, other_file, event_type):
-        if event_type == Gio.FileMonitorEvent.CHANGES_DONE_HINT:
-            print("Reloading CSS...")
-            self.load_css()
+        # Without WATCH_MOVES an atomic-rename save (vim, nvim) or a delete-and-recreate shows up
+        # as CREATED for the new file, so that and CHANGES_DONE_HINT cover every kind of save
+        if event_type not in (Gio.FileMonitorEvent.CHANGES_DONE_HINT, Gio.FileMonitorEvent.CREATED):
+            return
+        # Editors and theming tools often emit bursts of events per save; reload once it settles
+        if self.css_reload_source:
+            GLib.source_remove(self.css_reload_source)
+        self.css_reload_source = GLib.timeout_add(200, self._do_css_reload)
+
+    def _do_css_reload(self):
+        self.css_reload_source = None
+        print("Reloading CSS...")
+        self.load_css()
+        return GLib.SOURCE_REMOVE
 
     def setup_recording_controls(self, parent):
         controls_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
@@ -366,6 +611,7 @@ class MainWindow(Adw.ApplicationWindow):
         framerate_row = Adw.ActionRow(title="Framerate")
         self.framerate_entry = Gtk.Entry(text=self.app.settings['framerate'], placeholder_text="30", width_chars=10, valign=Gtk.Align.CENTER)
         self.framerate_entry.connect("changed", self.on_framerate_changed)
+        self.commit_on_finish(self.framerate_entry)
         framerate_row.add_suffix(self.framerate_entry)
         settings_box.append(framerate_row)
 
@@ -378,17 +624,30 @@ class MainWindow(Adw.ApplicationWindow):
         parent.append(status_box)
 
     def select_area(self, button):
+        # slurp runs until the user finishes selecting, so keep the main loop running meanwhile
         try:
-            result = subprocess.run(['slurp'], capture_output=True, text=True, check=False)
-            if result.returncode == 0 and result.stdout.strip():
-                geometry = result.stdout.strip()
-                self.app.settings['geometry'] = geometry
-                self.area_label.set_text(f"Area: {geometry}")
-            else:
-                self.app.settings['geometry'] = None
-                self.area_label.set_text("Area: Full Screen")
-        except FileNotFoundError:
+            proc = Gio.Subprocess.new(['slurp'], Gio.SubprocessFlags.STDOUT_PIPE)
+        except GLib.Error:
             self.show_error_dialog("`slurp` not found", "Please install `slurp` to use area selection.")
+            return
+        proc.communicate_utf8_async(None, None, self._on_slurp_done)
+
+    def _on_slurp_done(self, proc, result):
+        if not self.get_realized():
+            return
+        try:
+            _, stdout, _ = proc.communicate_utf8_finish(result)
+        except GLib.Error as e:
+            print(f"Error running slurp: {e.message}", file=sys.stderr)
+            stdout = None
+
+        geometry = stdout.strip() if stdout and proc.get_successful() else ''
+        if geometry:
+            self.app.settings['geometry'] = geometry
+            self.area_label.set_text(f"Area: {geometry}")
+        else:
+            self.app.settings['geometry'] = None
+            self.area_label.set_text("Area: Full Screen")
 
     def toggle_recording(self, button):
         if not self.app.is_recording:
@@ -404,55 +663,33 @@ class MainWindow(Adw.ApplicationWindow):
         
         if self.app.is_paused:
             self.recording_status_label.set_label("Paused")
-            if self.app.timer_id:
-                GLib.source_remove(self.app.timer_id)
-                self.app.timer_id = None
+            self.stop_time_ticks()
             # Store the time when pausing starts
-            self.pause_start_time = time.time()
+            self.pause_start_time = GLib.get_monotonic_time()
         else:
             self.recording_status_label.set_label("Recording...")
-            # Adjust start_time by the duration of the pause
+            # Adjust start_time_us by the duration of the pause
             if hasattr(self, 'pause_start_time'):
-                pause_duration = time.time() - self.pause_start_time
-                self.app.start_time += pause_duration
+                pause_duration = GLib.get_monotonic_time() - self.pause_start_time
+                self.app.start_time_us += pause_duration
                 del self.pause_start_time
-            # Restart the timer
-            if not self.app.timer_id:
-                self.app.timer_id = GLib.timeout_add_seconds(1, self.update_recording_time)
+            # Restart the clock
+            self.start_time_ticks()
 
         pause_button_label = "Resume" if self.app.is_paused else "Pause"
-        self.app.send_notification("rec-active", "Recording in Progress...", f"Time: {self.time_label.get_text()}",
+        self.app.send_notification("rec-active", "Recording in Progress...", f"Time: {self.get_elapsed_text()}",
             actions={"Stop": "app.stop", pause_button_label: "app.pause-resume"})
 
 
     def build_wf_recorder_command(self):
-        cmd = ['wf-recorder']
         s = self.app.settings
-        if s['audio_enabled']:
-            cmd.append('--audio')
-            if audio_device := s.get('audio_device', '').strip():
-                cmd.extend(['--audio-device', audio_device])
-
-        if codec := s.get('codec', '').strip(): cmd.extend(['-c', codec])
-        if (pix_fmt := s.get('pixel_format', '').strip()) and 'vaapi' not in s.get('codec', ''): cmd.extend(['-x', pix_fmt])
-        if (fr := s.get('framerate', '').strip()) and fr.isdigit(): cmd.extend(['-r', fr])
-        if geometry := s.get('geometry'): cmd.extend(['-g', geometry])
-        if vb := s.get('video_bitrate', '').strip(): cmd.extend(['-b', vb])
-
-        if s.get('hardware_acceleration'):
-            if gpu_dev := s.get('gpu_device', '').strip():
-                cmd.extend(['-d', gpu_dev])
-        
-        if s.get('codec', '').startswith(('libx264', 'libx265')):
-            if preset := s.get('preset', '').strip(): cmd.extend(['-p', f"preset={preset}"])
-            if crf := s.get('crf', '').strip(): cmd.extend(['-p', f"crf={crf}"])
-        
-        if custom_params := s.get('custom_params', '').strip():
-            cmd.extend(shlex.split(custom_params))
+        # Only the per-recording parts are computed here; the rest is cached on the app
+        cmd = list(self.app.get_recorder_args())
+        if geometry := s.get('geometry'):
+            cmd.extend(['-g', geometry])
 
-        timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
         container = s.get('container_format', 'mp4').strip() or 'mp4'
-        filename = f"Recording_{timestamp}.{container}"
+        filename = OUTPUT_FILENAME_TEMPLATE.format(ts=time.strftime(TIMESTAMP_FORMAT), ext=container)
         output_path = os.path.join(s['output_directory'], filename)
         cmd.extend(['-f', output_path])
         
@@ -464,35 +701,84 @@ class MainWindow(Adw.ApplicationWindow):
             os.makedirs(self.app.settings['output_directory'], exist_ok=True)
             cmd, _ = self.build_wf_recorder_command()
 
-            print(f"Starting recording with command: {' '.join(cmd)}")
-            self.app.recording_process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            time.sleep(0.5)
+            if DEBUG:
+                print(f"Starting recording with command: {shlex.join(cmd)}")
+            self.stderr_tail.clear()
+            process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            self.app.recording_process = process
 
-            if self.app.recording_process.poll() is not None:
-                _, stderr = self.app.recording_process.communicate()
-                self.show_error_dialog("Recording Failed to Start", f"wf-recorder error:\n{stderr}")
-                self.app.send_notification("rec-failed", "Recording Failed", "Could not start wf-recorder.", "dialog-error-symbolic")
-                self.app.recording_process = None
-                return
+            # The main loop reaps the child and drains its stderr, so no monitor thread is needed
+            self.child_watch_id = GLib.child_watch_add(GLib.PRIORITY_DEFAULT, process.pid, self._on_child_exit)
+            self.stderr_watch_id = GLib.io_add_watch(process.stderr.fileno(), GLib.PRIORITY_DEFAULT,
+                                                     GLib.IOCondition.IN | GLib.IOCondition.HUP, self._on_recorder_stderr)
 
-            self.app.is_recording = True
-            self.app.is_paused = False
-            self.update_ui_for_recording_start()
-            threading.Thread(target=self.monitor_recording_process, daemon=True).start()
-            self.app.send_notification("rec-active", "Recording Started", "Your screen is now being recorded.", actions={"Stop": "app.stop", "Pause": "app.pause-resume"})
+            # Give wf-recorder a moment to fail fast without blocking the main loop
+            self.record_button.set_sensitive(False)
+            self.startup_check_id = GLib.timeout_add(500, self._verify_recorder_started)
 
         except FileNotFoundError:
             self.show_error_dialog("wf-recorder not found", "Please install wf-recorder to use this application.")
         except Exception as e:
             self.show_error_dialog("Recording failed", str(e))
 
-    def monitor_recording_process(self):
-        if not self.app.recording_process: return
-        stdout, stderr = self.app.recording_process.communicate()
-        if self.app.is_recording:
-             GLib.idle_add(self.on_recording_process_ended, stdout, stderr)
+    def _verify_recorder_started(self):
+        # Still running after the grace period; an early exit is handled by _on_child_exit
+        self.startup_check_id = None
+        self.record_button.set_sensitive(True)
+        if not self.app.recording_process:
+            return GLib.SOURCE_REMOVE
+
+        self.app.is_recording = True
+        self.app.is_paused = False
+        self.update_ui_for_recording_start()
+        self.app.send_notification("rec-active", "Recording Started", "Your screen is now being recorded.", actions={"Stop": "app.stop", "Pause": "app.pause-resume"})
+        return GLib.SOURCE_REMOVE
 
-    def on_recording_process_ended(self, stdout, stderr):
+    def _on_recorder_stderr(self, fd, condition):
+        try:
+            data = os.read(fd, 4096)
+        except OSError:
+            data = b''
+        if not data:
+            self.stderr_watch_id = None
+            return GLib.SOURCE_REMOVE
+        # Only keep the tail of stderr so long recordings don't grow memory
+        self.stderr_tail.extend(data.decode(errors='replace').splitlines(keepends=True))
+        return GLib.SOURCE_CONTINUE
+
+    def _close_recorder_stderr(self, process):
+        """Stops watching the recorder's stderr, keeping anything still buffered in the pipe."""
+        if self.stderr_watch_id:
+            GLib.source_remove(self.stderr_watch_id)
+            self.stderr_watch_id = None
+        fd = process.stderr.fileno()
+        os.set_blocking(fd, False)
+        try:
+            while data := os.read(fd, 4096):
+                self.stderr_tail.extend(data.decode(errors='replace').splitlines(keepends=True))
+        except OSError:
+            pass
+        process.stderr.close()
+
+    def _on_child_exit(self, pid, status):
+        self.child_watch_id = None
+        process = self.app.recording_process
+        if not process or process.pid != pid:
+            return
+
+        self._close_recorder_stderr(process)
+        stderr = ''.join(self.stderr_tail)
+        if self.startup_check_id:
+            GLib.source_remove(self.startup_check_id)
+            self.startup_check_id = None
+            self.record_button.set_sensitive(True)
+            self.app.recording_process = None
+            self.show_error_dialog("Recording Failed to Start", f"wf-recorder error:\n{stderr}")
+            self.app.send_notification("rec-failed", "Recording Failed", "Could not start wf-recorder.", "dialog-error-symbolic")
+        elif self.app.is_recording:
+            self.on_recording_process_ended(stderr)
+
+    def on_recording_process_ended(self, stderr):
         print("Recording process ended unexpectedly", file=sys.stderr)
         self.app.is_recording = False
         self.app.recording_process = None
@@ -502,30 +788,41 @@ class MainWindow(Adw.ApplicationWindow):
         self.app.send_notification("rec-failed", "Recording Failed", error_message, "dialog-error-symbolic")
 
     def stop_recording(self):
-        if self.app.timer_id:
-            GLib.source_remove(self.app.timer_id)
-            self.app.timer_id = None
+        self.stop_time_ticks()
+        if self.startup_check_id:
+            GLib.source_remove(self.startup_check_id)
+            self.startup_check_id = None
+            self.record_button.set_sensitive(True)
 
         if self.app.recording_process:
+            process = self.app.recording_process
             self.app.is_recording = False
-            self.app.recording_process.send_signal(signal.SIGINT)
+            # We reap the process ourselves below, so GLib must not race us for it
+            if self.child_watch_id:
+                GLib.source_remove(self.child_watch_id)
+                self.child_watch_id = None
+            process.send_signal(signal.SIGINT)
             try:
-                self.app.recording_process.wait(timeout=5)
+                process.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                self.app.recording_process.kill()
-            
+                process.kill()
+                process.wait()
+            self._close_recorder_stderr(process)
+
             self.app.recording_process = None
             self.update_ui_for_recording_stop()
             self.app.send_notification("rec-saved", "Recording Saved", f"Saved to {os.path.basename(self.app.last_output_path)}", 'video-x-generic-symbolic',
                 {"Open Folder": "app.open-folder", "Open File": "app.open-file"})
 
     def update_ui_for_recording_start(self):
+        # Switching the stack maps the clock synchronously, so its state must be fresh beforehand
+        self.app.start_time_us = GLib.get_monotonic_time()
+        for label in self.time_labels:
+            label.set_text("00")
+        self._time_parts = [0, 0, 0]
         self.recording_stack.set_visible_child_name("recording_view")
         self.header_bar.set_visible(False)
-        self.app.start_time = time.time()
-        self.time_label.set_text("00:00:00")
-        if not self.app.timer_id:
-            self.app.timer_id = GLib.timeout_add_seconds(1, self.update_recording_time)
+        self.start_time_ticks()
 
     def update_ui_for_recording_stop(self, cancelled=False):
         self.recording_stack.set_visible_child_name("idle_view")
@@ -539,28 +836,74 @@ class MainWindow(Adw.ApplicationWindow):
              self.app.send_notification("rec-cancelled", "Recording Cancelled", "The recording was not saved.", "edit-delete-symbolic")
 
 
-    def update_recording_time(self):
+    def start_time_ticks(self):
+        # Only tick while the clock is on screen; the map/unmap handlers re-arm and stop it
+        if not self.app.tick_id and self.time_box.get_mapped():
+            self._schedule_time_tick()
+
+    def stop_time_ticks(self):
+        if self.app.tick_id:
+            GLib.source_remove(self.app.tick_id)
+            self.app.tick_id = None
+
+    def _schedule_time_tick(self):
+        # Fire just after the next whole second of recording time so the clock never drifts
+        elapsed_ms = (GLib.get_monotonic_time() - self.app.start_time_us) // 1000
+        self.app.tick_id = GLib.timeout_add(1000 - elapsed_ms % 1000, self._on_time_tick)
+
+    def _on_time_tick(self, _REMOVE=GLib.SOURCE_REMOVE):
+        self.app.tick_id = None
         if self.app.is_recording and not self.app.is_paused:
-            elapsed = int(time.time() - self.app.start_time)
-            hours, remainder = divmod(elapsed, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            self.time_label.set_text(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
-        return True
+            self.update_time_label()
+            self._schedule_time_tick()
+        return _REMOVE
+
+    def update_time_label(self):
+        elapsed = max(0, (GLib.get_monotonic_time() - self.app.start_time_us) // 1000000)
+        hours, remainder = divmod(elapsed, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        # Only touch the labels whose value changed; minutes and hours rarely do
+        for index, value in enumerate((hours, minutes, seconds)):
+            if value != self._time_parts[index]:
+                self._time_parts[index] = value
+                self.time_labels[index].set_text(TWO_DIGITS[value] if value < 100 else str(value))
+
+    def get_elapsed_text(self):
+        return ":".join(label.get_text() for label in self.time_labels)
+
+    def on_time_label_mapped(self, label):
+        if self.app.start_time_us is None:
+            return
+        if self.app.is_recording and not self.app.is_paused:
+            self.update_time_label()
+            self.start_time_ticks()
+
+    def commit_on_finish(self, entry):
+        """Saves debounced edits right away when the user presses Enter or leaves the entry."""
+        entry.connect("activate", lambda entry: self.app.flush_settings())
+        focus_controller = Gtk.EventControllerFocus()
+        focus_controller.connect("leave", lambda controller: self.app.flush_settings())
+        entry.add_controller(focus_controller)
 
     def on_audio_toggled(self, switch, gparam):
-        self.app.settings['audio_enabled'] = switch.get_active()
-        self.app.save_settings()
+        self.app.set_setting('audio_enabled', switch.get_active())
 
     def on_framerate_changed(self, entry):
-        self.app.settings['framerate'] = entry.get_text()
-        self.app.save_settings()
+        self.app.set_setting('framerate', entry.get_text())
 
     def show_settings(self, button):
+        if self.settings_view is None:
+            self.settings_view = AdvancedSettingsView(self)
+            self.main_stack.add_named(self.settings_view, "settings")
         self.main_stack.set_visible_child_name("settings")
 
     def show_main_view(self, button):
         self.main_stack.set_visible_child_name("main")
 
+    def on_close_request(self, window):
+        self.app.flush_settings()
+        return False
+
     def show_error_dialog(self, heading, body):
         dialog = Adw.AlertDialog.new(heading, body)
         dialog.add_response("ok", "OK")
@@ -568,11 +911,70 @@ class MainWindow(Adw.ApplicationWindow):
 
 
 class AdvancedSettingsView(Gtk.Box):
+    # (group title, rows, footer markup); each row is (kind, label, setting key[, placeholder])
+    _SETTING_SPECS = (
+        ("Output", (
+            ('folder', "Output Directory:", 'output_directory'),
+            ('entry', "Container Format:", 'container_format', "mp4"),
+        ), None),
+        ("Video", (
+            ('entry', "Video Codec:", 'codec', "libx264"),
+            ('entry', "Pixel Format:", 'pixel_format', "yuv420p"),
+            ('entry', "Video Bitrate:", 'video_bitrate', "e.g., 5M"),
+            ('entry', "Preset (x264/x265):", 'preset', "medium"),
+            ('entry', "CRF (x264/x265):", 'crf', "23"),
+        ), None),
+        ("Audio", (
+            ('entry', "Audio Codec:", 'audio_codec', "aac"),
+            ('entry', "Audio Bitrate:", 'audio_bitrate', "e.g., 192k"),
+            ('entry', "Sample Rate:", 'sample_rate', "48000"),
+            ('entry', "Audio Device:", 'audio_device', "Empty for default"),
+        ), None),
+        ("Hardware & Performance", (
+            ('switch', "Hardware Acceleration:", 'hardware_acceleration'),
+            ('entry', "GPU Device:", 'gpu_device', "/dev/dri/renderD128"),
+            ('entry', "Threads:", 'threads', "e.g., 4"),
+            ('entry', "Buffer Size:", 'buffer_size', "e.g., 20M"),
+        ), None),
+        ("Shortcuts", (
+            ('shortcut', "In-App Stop Shortcut:", 'stop_shortcut'),
+        ), "To stop recording from anywhere, set a global shortcut in your desktop environment's system settings to run this command:\n<tt>gapplication action com.wfrecorder.gui stop</tt>"),
+        ("Custom", (
+            ('entry', "Custom Params:", 'custom_params', "e.g., --overwrite"),
+        ), None),
+        ("Developer", (
+            ('switch', "Live CSS Reload:", 'live_css_reload'),
+        ), None),
+    )
+    _ROW_BUILDERS = {
+        'folder': 'add_setting_folder_chooser',
+        'entry': 'add_setting_entry',
+        'switch': 'add_setting_switch',
+        'shortcut': 'add_shortcut_setting',
+    }
+
     def __init__(self, parent_window, **kwargs):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, **kwargs)
         self.parent_window = parent_window
         self.app = parent_window.app
-        self.setting_widgets = {}
+        # Widget registry split by kind so refresh needs no type dispatch
+        self._entries = {}
+        self._switches = {}
+        self._labels = {}
+        self._buttons = {}
+        # Change-handler id per entry/switch, blocked while the UI is updated programmatically
+        self._handler_ids = {}
+        # One key controller shared by every shortcut dialog, moved onto the capture entry while one is open
+        self._shortcut_ctrl = Gtk.EventControllerKey.new()
+        self._shortcut_ctrl.connect("key-pressed", self._on_shortcut_key_pressed)
+        self._current_shortcut_dialog = None
+        self._current_entry = None
+        self._css_watcher_source = None
+        # (path, Gio.File) the folder chooser last opened on
+        self._last_folder = None
+        # Folder chooser kept for the page's lifetime, and its current response handler id
+        self._folder_dialog = None
+        self._folder_response_id = None
         self.setup_settings_list()
 
     def setup_settings_list(self):
@@ -581,61 +983,45 @@ class AdvancedSettingsView(Gtk.Box):
         scrolled.set_vexpand(True)
 
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=24, margin_top=24, margin_bottom=24, margin_start=24, margin_end=24)
-        scrolled.set_child(box)
-        self.append(scrolled)
-
-        output_group = self.create_settings_group("Output")
-        self.add_setting_folder_chooser(output_group, "Output Directory:", 'output_directory')
-        self.add_setting_entry(output_group, "Container Format:", 'container_format', "mp4")
-        box.append(output_group)
-
-        video_group = self.create_settings_group("Video")
-        self.add_setting_entry(video_group, "Video Codec:", 'codec', "libx264")
-        self.add_setting_entry(video_group, "Pixel Format:", 'pixel_format', "yuv420p")
-        self.add_setting_entry(video_group, "Video Bitrate:", 'video_bitrate', "e.g., 5M")
-        self.add_setting_entry(video_group, "Preset (x264/x265):", 'preset', "medium")
-        self.add_setting_entry(video_group, "CRF (x264/x265):", 'crf', "23")
-        box.append(video_group)
-
-        audio_group = self.create_settings_group("Audio")
-        self.add_setting_entry(audio_group, "Audio Codec:", 'audio_codec', "aac")
-        self.add_setting_entry(audio_group, "Audio Bitrate:", 'audio_bitrate', "e.g., 192k")
-        self.add_setting_entry(audio_group, "Sample Rate:", 'sample_rate', "48000")
-        self.add_setting_entry(audio_group, "Audio Device:", 'audio_device', "Empty for default")
-        box.append(audio_group)
-
-        perf_group = self.create_settings_group("Hardware & Performance")
-        self.add_setting_switch(perf_group, "Hardware Acceleration:", 'hardware_acceleration')
-        self.add_setting_entry(perf_group, "GPU Device:", 'gpu_device', "/dev/dri/renderD128")
-        self.add_setting_entry(perf_group, "Threads:", 'threads', "e.g., 4")
-        self.add_setting_entry(perf_group, "Buffer Size:", 'buffer_size', "e.g., 20M")
-        box.append(perf_group)
-
-        shortcut_group = self.create_settings_group("Shortcuts")
-        self.add_shortcut_setting(shortcut_group, "In-App Stop Shortcut:", 'stop_shortcut')
-        global_shortcut_info = Gtk.Label(
-            label="To stop recording from anywhere, set a global shortcut in your desktop environment's system settings to run this command:\n<tt>gapplication action com.wfrecorder.gui stop</tt>",
-            use_markup=True,
-            wrap=True,
-            xalign=0
-        )
-        global_shortcut_info.add_css_class("caption")
-        shortcut_group.append(global_shortcut_info)
-        box.append(shortcut_group)
-
-        custom_group = self.create_settings_group("Custom")
-        self.add_setting_entry(custom_group, "Custom Params:", 'custom_params', "e.g., --overwrite")
-        box.append(custom_group)
 
-        dev_group = self.create_settings_group("Developer")
-        self.add_setting_switch(dev_group, "Live CSS Reload:", 'live_css_reload')
-        box.append(dev_group)
+        # Only the group headers are built now; rows (and footers, queued as markup strings)
+        # are materialized in idle batches once the page is first shown
+        self._pending_rows = deque()
+        for title, rows, footer in self._SETTING_SPECS:
+            group = self.create_settings_group(title)
+            self._pending_rows.extend((group, spec) for spec in rows)
+            if footer:
+                self._pending_rows.append((group, footer))
+            box.append(group)
 
         restore_button = Gtk.Button(label="Restore Defaults", halign=Gtk.Align.END)
         restore_button.add_css_class("destructive-action")
         restore_button.connect("clicked", self.on_restore_defaults_clicked)
         box.append(restore_button)
 
+        # Attach the group skeleton in one go; rows are appended to it batch by batch
+        scrolled.set_child(box)
+        self.append(scrolled)
+        self._map_handler_id = self.connect("map", self._on_first_map)
+
+    def _on_first_map(self, widget):
+        self.disconnect(self._map_handler_id)
+        GLib.idle_add(self._materialize_next_batch, 8)
+
+    def _materialize_next_batch(self, batch_size):
+        # Rows read their initial values from one snapshot per batch rather than the live settings dict
+        values = dict(self.app.settings)
+        pending = self._pending_rows
+        for _ in range(min(batch_size, len(pending))):
+            group, spec = pending.popleft()
+            if isinstance(spec, str):
+                footer_label = Gtk.Label(label=spec, use_markup=True, wrap=True, xalign=0)
+                footer_label.add_css_class("caption")
+                group.append(footer_label)
+            else:
+                self._add_row(group, values, spec)
+        return GLib.SOURCE_CONTINUE if pending else GLib.SOURCE_REMOVE
+
     def on_restore_defaults_clicked(self, button):
         dialog = Adw.AlertDialog(title="Restore Default Settings?")
         dialog.set_body("This will replace all settings with their defaults. This cannot be undone.")
@@ -647,22 +1033,40 @@ class AdvancedSettingsView(Gtk.Box):
 
     def on_restore_dialog_response(self, dialog, response_id):
         if response_id == "restore":
-            self.app.settings = self.app.get_default_settings()
-            self.app.save_settings()
+            self.app.reset_settings()
             self.refresh_settings_ui()
+            # The refresh blocks the switch handlers, so apply the restored live_css_reload here
+            self.parent_window.update_css_watcher()
             self.parent_window.setup_shortcuts()
 
     def refresh_settings_ui(self):
-        for key, value in self.app.settings.items():
-            if widget := self.setting_widgets.get(key):
-                if isinstance(widget, Gtk.Entry):
-                    widget.set_text(str(value) if value is not None else "")
-                elif isinstance(widget, Gtk.Switch):
-                    widget.set_active(bool(value))
-                elif isinstance(widget, Gtk.Label):
-                    widget.set_text(str(value))
-                elif isinstance(widget, Gtk.Button):
-                    widget.set_label(self.app.settings.get(key, ""))
+        # The settings dict is already up to date, so the change handlers are blocked rather than re-saving it
+        settings = self.app.settings
+        for key, entry in self._entries.items():
+            value = settings.get(key)
+            text = str(value) if value is not None else ""
+            if entry.get_text() != text:
+                self._set_quietly(entry, Gtk.Entry.set_text, text)
+        for key, switch in self._switches.items():
+            active = bool(settings.get(key))
+            if switch.get_active() != active:
+                self._set_quietly(switch, Gtk.Switch.set_active, active)
+        for key, label in self._labels.items():
+            text = str(settings.get(key, ""))
+            if label.get_text() != text:
+                label.set_text(text)
+        for key, button in self._buttons.items():
+            text = settings.get(key, "")
+            if button.get_label() != text:
+                button.set_label(text)
+
+    def _set_quietly(self, widget, setter, value):
+        handler_id = self._handler_ids[widget]
+        widget.handler_block(handler_id)
+        try:
+            setter(widget, value)
+        finally:
+            widget.handler_unblock(handler_id)
 
 
     def create_settings_group(self, title):
@@ -673,133 +1077,160 @@ class AdvancedSettingsView(Gtk.Box):
         group.append(title_label)
         return group
 
-    def add_setting_folder_chooser(self, parent, label_text, setting_key):
-        row = Adw.ActionRow(title=label_text)
+    def _add_row(self, parent, values, spec):
+        kind, label_text, setting_key, *extra = spec
+        getattr(self, self._ROW_BUILDERS[kind])(parent, values, label_text, setting_key, *extra)
+
+    def _make_row(self, parent, label_text, suffix, activatable=False):
+        """Appends an action row titled label_text with suffix as its control."""
+        row = Adw.ActionRow.new()
+        row.set_title(label_text)
+        row.add_suffix(suffix)
+        if activatable:
+            row.set_activatable_widget(suffix)
+        parent.append(row)
+        return row
+
+    def add_setting_folder_chooser(self, parent, values, label_text, setting_key):
         button = Gtk.Button(
-            label=self.app.settings[setting_key],
+            label=values[setting_key],
             valign=Gtk.Align.CENTER,
             halign=Gtk.Align.FILL
         )
-        if button.get_child():
-            button.get_child().set_ellipsize(Pango.EllipsizeMode.MIDDLE)
-        button.connect("clicked", self.on_choose_folder_clicked, setting_key)
-        row.add_suffix(button)
-        parent.append(row)
-        self.setting_widgets[setting_key] = button.get_child()
-
-    def on_choose_folder_clicked(self, button, setting_key):
-        dialog = Gtk.FileChooserNative(
-            title="Choose Output Directory",
-            transient_for=self.parent_window,
-            action=Gtk.FileChooserAction.SELECT_FOLDER
-        )
-        dialog.connect("response", self.on_folder_selected, button.get_child(), setting_key)
+        label_child = button.get_child()
+        label_child.set_ellipsize(Pango.EllipsizeMode.MIDDLE)
+        button.connect("clicked", self.on_choose_folder_clicked, setting_key, label_child)
+        self._make_row(parent, label_text, button)
+        self._labels[setting_key] = label_child
+
+    def on_choose_folder_clicked(self, button, setting_key, label_widget):
+        dialog = self._folder_dialog
+        if dialog is None:
+            dialog = self._folder_dialog = Gtk.FileChooserNative(
+                title="Choose Output Directory",
+                transient_for=self.parent_window,
+                action=Gtk.FileChooserAction.SELECT_FOLDER
+            )
+        elif self._folder_response_id is not None:
+            dialog.disconnect(self._folder_response_id)
+        # Open on the saved folder instead of letting the chooser fall back to home
+        path = self.app.settings.get(setting_key)
+        if path and os.path.isdir(path):
+            if self._last_folder is None or self._last_folder[0] != path:
+                self._last_folder = (path, Gio.File.new_for_path(path))
+            try:
+                dialog.set_current_folder(self._last_folder[1])
+            except GLib.Error as e:
+                print(f"Could not open folder chooser at {path}: {e.message}", file=sys.stderr)
+        self._folder_response_id = dialog.connect("response", partial(self.on_folder_selected, setting_key, label_widget))
         dialog.show()
 
-    def on_folder_selected(self, dialog, response, label_widget, setting_key):
-        if response == Gtk.ResponseType.ACCEPT:
-            if folder := dialog.get_file():
-                path = folder.get_path()
-                self.app.settings[setting_key] = path
+    def on_folder_selected(self, setting_key, label_widget, dialog, response, _ACCEPT=Gtk.ResponseType.ACCEPT):
+        if response == _ACCEPT:
+            folder = dialog.get_file()
+            path = folder.get_path() if folder else None
+            if path and self.app.set_setting(setting_key, path):
                 label_widget.set_text(path)
-                self.app.save_settings()
-        dialog.destroy()
-
-    def add_setting_entry(self, parent, label_text, setting_key, placeholder):
-        row = Adw.ActionRow(title=label_text)
+        dialog.hide()
+
+    def add_setting_entry(self, parent, values, label_text, setting_key, placeholder):
+        # Loaded values are normally strings already; only None and stray numbers need converting
+        text = values.get(setting_key)
+        if text is None:
+            text = ''
+        elif not isinstance(text, str):
+            text = str(text)
         entry = Gtk.Entry(
-            text=str(self.app.settings.get(setting_key, '')),
+            text=text,
             placeholder_text=placeholder,
             valign=Gtk.Align.CENTER
         )
-        entry.connect("changed", self.on_setting_changed, setting_key)
-        row.add_suffix(entry)
-        row.set_activatable_widget(entry)
-        parent.append(row)
-        self.setting_widgets[setting_key] = entry
-
-    def add_setting_switch(self, parent, label_text, setting_key):
-        row = Adw.ActionRow(title=label_text)
-        switch = Gtk.Switch(active=self.app.settings.get(setting_key, False), valign=Gtk.Align.CENTER)
-        switch.connect("notify::active", self.on_setting_changed, setting_key)
-        row.add_suffix(switch)
-        row.set_activatable_widget(switch)
-        parent.append(row)
-        self.setting_widgets[setting_key] = switch
-
-    def add_shortcut_setting(self, parent, label_text, setting_key):
-        row = Adw.ActionRow(title=label_text)
-        
-        shortcut_str = self.app.settings.get(setting_key, "")
+        self._handler_ids[entry] = entry.connect("changed", partial(self._apply_setting, setting_key, Gtk.Entry.get_text))
+        self.parent_window.commit_on_finish(entry)
+        self._make_row(parent, label_text, entry, activatable=True)
+        self._entries[setting_key] = entry
+
+    def add_setting_switch(self, parent, values, label_text, setting_key):
+        active = bool(values.get(setting_key))
+        switch = Gtk.Switch(active=active, valign=Gtk.Align.CENTER)
+        self._handler_ids[switch] = switch.connect("notify::active", partial(self._apply_setting, setting_key, Gtk.Switch.get_active))
+        self._make_row(parent, label_text, switch, activatable=True)
+        self._switches[setting_key] = switch
+
+    def add_shortcut_setting(self, parent, values, label_text, setting_key):
+        shortcut_str = values.get(setting_key, "")
         button = Gtk.Button(label=shortcut_str, valign=Gtk.Align.CENTER)
         button.connect("clicked", self.on_shortcut_button_clicked, setting_key)
-
-        row.add_suffix(button)
-        parent.append(row)
-        self.setting_widgets[setting_key] = button
+        self._make_row(parent, label_text, button)
+        self._buttons[setting_key] = button
 
     def on_shortcut_button_clicked(self, button, setting_key):
-        dialog = Adw.Dialog(title="Set Shortcut", transient_for=self.parent_window)
+        dialog = Adw.AlertDialog(heading="Set Shortcut")
         dialog.add_response("cancel", "Cancel")
         dialog.add_response("set", "Set")
         dialog.set_response_appearance("set", Adw.ResponseAppearance.SUGGESTED)
         dialog.set_default_response("set")
-        
-        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12, margin_top=12, margin_bottom=12, margin_start=12, margin_end=12)
-        dialog.set_content(content_box)
-        
+        dialog.set_close_response("cancel")
+
+        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        dialog.set_extra_child(content_box)
+
         label = Gtk.Label(label="Press the desired key combination.")
         content_box.append(label)
 
         key_capture_entry = Gtk.Entry(editable=False, placeholder_text="Press a key combination...")
         content_box.append(key_capture_entry)
 
+        # (keyval, modifiers) of the last key press; the accelerator string is only built on "set"
         dialog.accelerator = None
 
-        controller = Gtk.EventControllerKey.new()
-        def on_key_pressed(ctrl, keyval, keycode, state):
-            name = Gtk.accelerator_name_with_keycode(None, keyval, keycode, state)
-            label_text = Gtk.accelerator_get_label(keyval, state)
-            key_capture_entry.set_text(label_text)
-            dialog.accelerator = name
-            return Gdk.EVENT_STOP
+        self._release_shortcut_ctrl()
+        key_capture_entry.add_controller(self._shortcut_ctrl)
+        self._current_shortcut_dialog = dialog
+        self._current_entry = key_capture_entry
 
-        controller.connect("key-pressed", on_key_pressed)
-        key_capture_entry.add_controller(controller)
-        
         dialog.connect("response", self.on_shortcut_dialog_response, setting_key, button)
-        dialog.present()
+        dialog.connect("closed", lambda dialog: self._release_shortcut_ctrl())
+        dialog.present(self.parent_window)
+        # The key controller only sees presses while the capture entry has focus
+        dialog.set_focus(key_capture_entry)
+
+    def _on_shortcut_key_pressed(self, ctrl, keyval, keycode, state):
+        mods = state & Gtk.accelerator_get_default_mod_mask()
+        self._current_entry.set_text(Gtk.accelerator_get_label(keyval, mods))
+        self._current_shortcut_dialog.accelerator = (keyval, mods)
+        return Gdk.EVENT_STOP
+
+    def _release_shortcut_ctrl(self):
+        if self._current_entry is not None:
+            self._current_entry.remove_controller(self._shortcut_ctrl)
+            self._current_shortcut_dialog = self._current_entry = None
 
     def on_shortcut_dialog_response(self, dialog, response_id, setting_key, button):
         if response_id == "set":
-            accelerator = dialog.accelerator
-            if accelerator:
-                self.app.settings[setting_key] = accelerator
+            if dialog.accelerator:
+                accelerator = Gtk.accelerator_name(*dialog.accelerator)
+                # Re-capturing the current shortcut changes nothing, so skip the label and trigger updates
+                if not self.app.set_setting(setting_key, accelerator):
+                    return
                 button.set_label(accelerator)
-                self.app.save_settings()
-                self.parent_window.setup_shortcuts()
-                self.parent_window.shortcut_label_recording.set_accelerator(accelerator)
+                self.parent_window.update_shortcut(setting_key, accelerator)
 
 
-    def on_setting_changed(self, widget, *args):
-        setting_key = None
-        for key, w in self.setting_widgets.items():
-            if w == widget or (hasattr(w, 'get_child') and w.get_child() == widget):
-                setting_key = key
-                break
-        
-        if not setting_key:
+    def _apply_setting(self, setting_key, getter, widget, pspec=None):
+        """Shared handler for entry "changed" and switch "notify::active"; the key and getter are bound per row."""
+        if not self.app.set_setting(setting_key, getter(widget)):
             return
 
-        if isinstance(widget, Gtk.Entry):
-            self.app.settings[setting_key] = widget.get_text()
-        elif isinstance(widget, Gtk.Switch):
-            self.app.settings[setting_key] = widget.get_active()
-
-        self.app.save_settings()
-
         if setting_key == 'live_css_reload':
-            self.parent_window.update_css_watcher()
+            # Reconfigure the file monitor at most once per main-loop iteration
+            if not self._css_watcher_source:
+                self._css_watcher_source = GLib.idle_add(self._update_css_watcher)
+
+    def _update_css_watcher(self):
+        self._css_watcher_source = None
+        self.parent_window.update_css_watcher()
+        return GLib.SOURCE_REMOVE
 
 
 def main():